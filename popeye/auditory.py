@@ -3,11 +3,8 @@
 """ Classes and functions for fitting population encoding models """
 
 from __future__ import division
-import warnings
-warnings.simplefilter("ignore")
 
 import numpy as np
-from scipy.signal import fftconvolve
 from scipy.interpolate import interp1d
 from scipy.stats import linregress
 import nibabel
@@ -47,7 +44,7 @@ class AuditoryModel(PopulationModel):
         # invoke the base class
         PopulationModel.__init__(self, stimulus, hrf_model, normalizer)
     
-    def generate_ballpark_prediction(self, center_freq, sigma):
+    def generate_ballpark_prediction(self, center_freq, sigma, data=None):
 
         r"""
         Generate a prediction for the 1D Gaussian model.
@@ -69,6 +66,9 @@ class AuditoryModel(PopulationModel):
         sigma : float
             The dispersion of the 1D Gaussian, units are in Hz.
             
+        data : ndarray
+            The timeseries the prediction is scaled to, defaults to `self.data`.
+        
         """
         
         # receptive field
@@ -82,13 +82,16 @@ class AuditoryModel(PopulationModel):
         response = generate_rf_timeseries_1D(self.stimulus.spectrogram, rf, mask)
         
         # convolve it with the stimulus
-        model = fftconvolve(response, self.hrf())[0:len(response)]
+        model = self.convolve_hrf(response)
         
         # units
         model = self.normalizer(model)
         
+        if data is None:
+            data = self.data
+        
         # regress out mean and amplitude
-        beta, baseline = self.regress(model, self.data)
+        beta, baseline = self.regress(model, data)
         
         # scale
         model *= beta
@@ -136,7 +139,7 @@ class AuditoryModel(PopulationModel):
         response = generate_rf_timeseries_1D(self.stimulus.spectrogram, rf, mask)
         
         # convolve it with the stimulus
-        model = fftconvolve(response, self.hrf())[0:len(response)]
+        model = self.convolve_hrf(response)
         
         # units
         model = self.normalizer(model)
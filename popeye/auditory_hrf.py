@@ -3,8 +3,6 @@
 """ Classes and functions for fitting population encoding models """
 
 from __future__ import division
-import warnings
-warnings.simplefilter("ignore")
 
 import numpy as np
 from scipy.signal import fftconvolve
@@ -47,7 +45,7 @@ class AuditoryModel(PopulationModel):
         # invoke the base class
         PopulationModel.__init__(self, stimulus, hrf_model)
     
-    def generate_ballpark_prediction(self, center_freq, sigma, hrf_delay):
+    def generate_ballpark_prediction(self, center_freq, sigma, hrf_delay, data=None):
         
         r"""
         Generate a prediction for the 1D Gaussian model.
@@ -73,6 +71,9 @@ class AuditoryModel(PopulationModel):
         hrf_delay : float
             The delay of the HRF, units are in seconds.
             
+        data : ndarray
+            The timeseries the prediction is scaled to, defaults to `self.data`.
+        
         """
         
         # receptive field
@@ -95,8 +96,11 @@ class AuditoryModel(PopulationModel):
         # units
         model = (model - np.mean(model)) / np.mean(model)
         
+        if data is None:
+            data = self.data
+        
         # regress out mean and linear
-        p = linregress(model, self.data)
+        p = linregress(model, data)
         
         # scale
         model *= p[0]
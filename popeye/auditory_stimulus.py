@@ -9,23 +9,68 @@ with an arbitrary number of dimensions (e.g., auditory stimuli).
 from __future__ import division
 import ctypes
 
-from scipy.signal import spectrogram
+from scipy.signal import get_window
 import numpy as np
+import numexpr as ne
+from numpy.lib.stride_tricks import as_strided
 
 from popeye.base import StimulusModel
 from popeye.onetime import auto_attr
 import popeye.utilities as utils
 
-def generate_spectrogram(signal, Fs, tr_length, noverlap=0, bins_per_octave = 20*12, freq_min = 200 ,decibels=True):
+def generate_spectrogram(signal, Fs, tr_length, noverlap=0, bins_per_octave = 20*12, freq_min = 200 ,decibels=True,
+                         window=('tukey', 0.25)):
     
     # window size is 1 TR x samples per seconds
-    win = Fs*tr_length
+    win = int(Fs*tr_length)
     
     # find num freqs
     nfft=win
     
-    # get spectrum
-    freqs, times, spec = spectrogram(signal, Fs, nperseg=int(win), noverlap=noverlap, nfft=nfft)
+    # hop between successive windows
+    step = win - noverlap
+    
+    # frame the signal as a strided view, one window per row
+    signal = np.ascontiguousarray(signal, dtype='double')
+    nframes = (len(signal) - noverlap) // step
+    frames = as_strided(signal, shape=(nframes, win),
+                        strides=(signal.strides[0]*step, signal.strides[0]))
+    
+    # the taper, None means rectangular (same defaults as scipy.signal.spectrogram)
+    if window is None:
+        window = np.ones(win)
+    elif not isinstance(window, np.ndarray):
+        window = get_window(window, win)
+    
+    # get spectrum, all frames in a single batched FFT
+    if np.all(window == 1):
+        
+        # with a rectangular window the frame mean only lands in the DC bin,
+        # so the strided view is transformed as-is and detrended afterwards
+        spec = np.fft.rfft(frames, n=nfft, axis=-1)
+        spec[:,0] = 0
+        
+    else:
+        
+        # detrend and taper each frame
+        frames = frames - frames.mean(axis=-1)[:,np.newaxis]
+        frames *= window
+        spec = np.fft.rfft(frames, n=nfft, axis=-1)
+    
+    # power spectral density, z*conj(z) avoids the sqrt in abs(z)**2
+    scale = Fs * np.sum(window**2)
+    spec = ne.evaluate('real(spec*conj(spec))/scale')
+    
+    # fold the negative frequencies in
+    if nfft % 2:
+        spec[:,1:] *= 2
+    else:
+        spec[:,1:-1] *= 2
+    
+    # freqs x times
+    spec = spec.T
+    freqs = np.fft.rfftfreq(nfft, 1/Fs)
+    times = (np.arange(nframes)*step + win/2)/Fs
     
     if decibels: # pragma: no cover
         
@@ -60,9 +105,10 @@ def generate_spectrogram(signal, Fs, tr_length, noverlap=0, bins_per_octave = 20
         mx = np.exp( -0.5*freqdiff**2 );
         D = np.sqrt(2*np.sum(mx**2,1))
         E = mx / np.tile(D, (nfftbins,1)).T
-        Sx = spec.copy()
-        Px = np.matrix(spec[1::])
-        spec = np.array(np.matrix(mx) * Px)
+        
+        # map onto the log-f axis, a plain dot product rather than a
+        # round trip through np.matrix, which copies the spectrogram twice
+        spec = np.dot(mx, spec[1::])
         
         # output
         times = np.arange(spec.shape[-1])
@@ -97,9 +143,9 @@ class AuditoryStimulus(StimulusModel):
         self.tr_length = tr_length
         
         # # create spectrogram
-        specgram, freqs, times, = generate_spectrogram(self.stim_arr, Fs, tr_length)
+        spec, freqs, times, = generate_spectrogram(self.stim_arr, Fs, tr_length)
         
-        # share them
-        self.spectrogram = utils.generate_shared_array(specgram, ctypes.c_double)
-        self.freqs = utils.generate_shared_array(freqs, ctypes.c_double)
+        # share them, freqs is small and never written to so it stays local
+        self.spectrogram = utils.generate_shared_array(spec, ctypes.c_double)
+        self.freqs = freqs
         self.times = utils.generate_shared_array(times, ctypes.c_int16)
@@ -7,17 +7,30 @@ Base-classes for poulation encoding models and fits.
 from popeye.onetime import auto_attr
 import time, ctypes, itertools
 import pickle
-import sharedmem
-from scipy.stats import linregress
+import multiprocessing
 import popeye.utilities as utils
 import numpy as np
-import numexpr as ne
+from scipy.fft import rfft, irfft, next_fast_len
 
 try:  # pragma: no cover
     from types import SliceType
 except ImportError:  # pragma: no cover
     SliceType = slice
 
+def _init_cache_worker(model, verbose): # pragma: no cover
+    
+    # each worker holds the model once, rather than once per combo
+    global _CACHE_MODEL, _CACHE_VERBOSE
+    _CACHE_MODEL = model
+    _CACHE_VERBOSE = verbose
+
+def _cache_worker(combo_long): # pragma: no cover
+    combo = combo_long[:-2]
+    if _CACHE_VERBOSE:
+        print('%s' %(np.round(combo,2)))
+    data = _CACHE_MODEL.generate_prediction(*combo_long)
+    return _CACHE_MODEL.generate_ballpark_prediction(*combo, data=data), combo
+
 def set_verbose(verbose):
     
     r"""A convenience function for setting the verbosity of a popeye model/fit.
@@ -81,6 +94,14 @@ class PopulationModel(object):
         self.nuisance = nuisance
         self.cached_model_path = cached_model_path
         
+        # last HRF evaluated by `hrf`
+        self._hrf_key = None
+        self._hrf = None
+        
+        # spectrum of that HRF, kept by `convolve_hrf`
+        self._hrf_fft_key = None
+        self._hrf_fft = None
+        
         # set up cached model if specified
         if self.cached_model_path is not None: # pragma: no cover
             self.resurrect_cached_model
@@ -92,7 +113,14 @@ class PopulationModel(object):
         raise NotImplementedError("Each pRF model must implement its own prediction!")
     
     def regress(self, X, y):
-        slope, intercept = linregress(X, y)[0:2]
+        
+        # least-squares slope and intercept, without the stats linregress adds.
+        # dx sums to zero, so y needs no centering for the slope
+        xm = X.mean()
+        dx = X - xm
+        slope = np.dot(dx, y) / np.dot(dx, dx)
+        intercept = y.mean() - slope * xm
+        
         if hasattr(self, 'bounded_amplitude') and self.bounded_amplitude:
             return np.abs(slope), intercept
         else:
@@ -101,9 +129,13 @@ class PopulationModel(object):
     def distance_mask_coarse(self, x, y, sigma):
         
         if hasattr(self, 'mask_size'): # pragma: no cover
-            distance = (self.stimulus.deg_x0 - x)**2 + (self.stimulus.deg_y0 - y)**2
-            mask = np.zeros_like(distance, dtype='uint8')
-            mask[distance < self.mask_size*sigma**2] = 1
+            
+            # the coordinate matrices come from np.meshgrid, so the squared
+            # distances separate into a row and a column that broadcast
+            dx2 = (self.stimulus.deg_x0[0,:] - x)**2
+            dy2 = (self.stimulus.deg_y0[:,0] - y)**2
+            distance = dy2[:,np.newaxis] + dx2[np.newaxis,:]
+            mask = (distance < self.mask_size*sigma**2).view('uint8')
         else: # pragma: no cover
             mask = np.ones_like(self.stimulus.deg_x0, dtype='uint8')
             
@@ -112,9 +144,13 @@ class PopulationModel(object):
     def distance_mask(self, x, y, sigma):
         
         if hasattr(self, 'mask_size'): # pragma: no cover
-            distance = (self.stimulus.deg_x - x)**2 + (self.stimulus.deg_y - y)**2
-            mask = np.zeros_like(distance, dtype='uint8')
-            mask[distance < self.mask_size*sigma**2] = 1
+            
+            # the coordinate matrices come from np.meshgrid, so the squared
+            # distances separate into a row and a column that broadcast
+            dx2 = (self.stimulus.deg_x[0,:] - x)**2
+            dy2 = (self.stimulus.deg_y[:,0] - y)**2
+            distance = dy2[:,np.newaxis] + dx2[np.newaxis,:]
+            mask = (distance < self.mask_size*sigma**2).view('uint8')
         else: # pragma: no cover
             mask = np.ones_like(self.stimulus.deg_x, dtype='uint8')
             
@@ -122,10 +158,40 @@ class PopulationModel(object):
     
     def hrf(self):
         if hasattr(self, 'hrf_delay'): # pragma: no cover
-            return self.hrf_model(self.hrf_delay, self.stimulus.tr_length)
+            
+            # the HRF only changes with the delay and TR, so reuse the last one
+            key = (self.hrf_model, self.hrf_delay, self.stimulus.tr_length)
+            if self._hrf_key != key:
+                self._hrf = self.hrf_model(self.hrf_delay, self.stimulus.tr_length)
+                self._hrf_key = key
+            return self._hrf
         else: # pragma: no cover
             raise NotImplementedError("You must set the HRF delay to generate the HRF")
     
+    def convolve_hrf(self, response):
+        
+        r"""Returns `response` convolved with the HRF and cut to its length, the
+        same as `fftconvolve(response, self.hrf())[0:len(response)]`. The HRF
+        spectrum is kept between calls, so only `response` is transformed.
+        
+        Paramaters
+        ----------
+        
+        response : ndarray
+            The neural response timeseries.
+        
+        """
+        
+        hrf = self.hrf()
+        nfft = next_fast_len(len(response) + len(hrf) - 1, True)
+        
+        # `hrf` hands back the same array until the delay or TR changes
+        if self._hrf_fft_key is None or self._hrf_fft_key[0] is not hrf or self._hrf_fft_key[1] != nfft:
+            self._hrf_fft = rfft(hrf, nfft)
+            self._hrf_fft_key = (hrf, nfft)
+        
+        return irfft(rfft(response, nfft) * self._hrf_fft, nfft)[0:len(response)]
+    
     def cache_model(self, grids, ncpus=1, Ns=None, verbose=False):
         
         # get parameter space
@@ -136,23 +202,19 @@ class PopulationModel(object):
         
         # make combos
         combos = np.array([c for c in itertools.product(*params)])
-        # const = np.vstack((np.ones(combos.shape[0]),np.zeros(combos.shape[0]))).T
-        # combos = np.concatenate((combos,const,1))
         
-        # sort them by rand
-        idx = np.argsort(np.random.rand(combos.shape[0]))
-        combos = combos[idx]
+        # append unit beta and zero baseline columns up front
+        combos_long = np.column_stack((combos, np.ones(combos.shape[0]), np.zeros(combos.shape[0])))
         
-        def mini_predictor(combo): # pragma: no cover
-            print('%s' %(np.round(combo,2)))
-            combo_long = list(combo)
-            combo_long.extend((1,0))
-            self.data = self.generate_prediction(*combo_long)
-            return self.generate_ballpark_prediction(*combo), combo
-        
-        # compute predictions
-        with sharedmem.Pool(np=ncpus) as pool:
-            models = pool.map(mini_predictor, combos)
+        # compute predictions, the workers inherit the model (and its
+        # sharedmem stimulus) when forked, so it is never pickled per combo
+        ctx = multiprocessing.get_context('fork')
+        pool = ctx.Pool(ncpus, initializer=_init_cache_worker, initargs=(self, verbose))
+        try:
+            models = pool.map(_cache_worker, combos_long)
+        finally:
+            pool.close()
+            pool.join()
         
         # clean up
         models = [m for m in models if not np.isnan(np.sum(m[0]))]
@@ -163,17 +225,72 @@ class PopulationModel(object):
     @auto_attr
     def resurrect_cached_model(self):
         dat = pickle.load(open(self.cached_model_path, 'rb'))
-        timeseries = utils.generate_shared_array(np.array([d[0] for d in dat]), np.double)
+        
+        # single precision is plenty for ranking RSS and halves the bandwidth
+        timeseries = utils.generate_shared_array(np.array([d[0] for d in dat]), np.float32)
         parameters = utils.generate_shared_array(np.array([d[1] for d in dat]), np.double)
-        return timeseries, parameters
+        sumsq = utils.generate_shared_array(np.einsum('ij,ij->i', timeseries, timeseries, dtype=np.double), np.double)
+        return timeseries, parameters, sumsq
     
     @auto_attr
-    def cached_model_timeseries(self): # pragma: no cover
+    def cached_model_timeseries(self):
         return self.resurrect_cached_model[0]
     
     @auto_attr
-    def cached_model_parameters(self): # pragma: no cover
+    def cached_model_parameters(self):
         return self.resurrect_cached_model[1]
+    
+    @auto_attr
+    def cached_model_sumsq(self):
+        return self.resurrect_cached_model[2]
+    
+    def lookup_cached_model(self, data, block_size=1024):
+        
+        r"""Returns the cached model parameters with the smallest RSS to `data`.
+        
+        Paramaters
+        ----------
+        
+        data : ndarray
+            A single timeseries, or a (voxels x time) array of timeseries. For
+            the latter, the voxels are matched against the cache `block_size`
+            at a time.
+        
+        block_size : int
+            The number of voxels matched per block. The working memory is
+            about 12 bytes per cached model per voxel in the block.
+        
+        """
+        
+        a = self.cached_model_timeseries
+        sumsq = self.cached_model_sumsq[:,np.newaxis]
+        b = np.atleast_2d(data)
+        bb = np.einsum('ij,ij->i', b, b)
+        
+        # in single precision a.b can be off by about T*eps*|a||b|, which swamps
+        # the rss gap between near-tied models. every model within that bound
+        # of the best is re-ranked against the data in double precision
+        eps = np.finfo(a.dtype).eps
+        tol = 4 * (a.shape[1] + 1) * eps * np.sqrt(self.cached_model_sumsq.max() * bb)
+        
+        idx = np.empty(b.shape[0], dtype=np.intp)
+        for start in range(0, b.shape[0], block_size):
+            block = slice(start, start+block_size)
+            
+            # |a-b|**2 = |a|**2 - 2a.b + |b|**2, so the only O(N*T) work is one GEMM
+            rss = np.multiply(a.dot(b[block].T.astype(a.dtype)), -2, dtype=np.double)
+            rss += sumsq
+            rss += bb[block]
+            
+            for j, v in enumerate(range(start, min(start+block_size, b.shape[0]))):
+                near = np.flatnonzero(rss[:,j] <= rss[:,j].min() + tol[v])
+                resid = a[near] - b[v]
+                idx[v] = near[np.argmin(np.einsum('ij,ij->i', resid, resid))]
+        
+        if np.ndim(data) == 1:
+            return self.cached_model_parameters[idx[0]]
+        else:
+            return self.cached_model_parameters[idx]
         
         
 class PopulationFit(object):
@@ -242,6 +359,15 @@ class PopulationFit(object):
             1 = print the final solution of an error-minimization
             2 = print each error-minimization step
         
+        Notes
+        -----
+        
+        The brute-force grid-search runs on a single thread unless the model
+        has a `brute_force_threads` attribute, e.g. `model.brute_force_threads = 4`.
+        The grid points are then evaluated on that many threads, which share
+        the model and its stimulus with the calling process. This is separate
+        from the `ncpus` of `PopulationModel.cache_model`, which are processes.
+        
         """
         
         # absorb vars
@@ -304,21 +430,31 @@ class PopulationFit(object):
     
     @auto_attr
     def best_cached_model_parameters(self): # pragma: no cover
-        a = self.model.cached_model_timeseries
-        b = self.data
-        rss = ne.evaluate('sum((a-b)**2,axis=1)')
-        idx = np.argmin(rss)
-        return self.model.cached_model_parameters[idx]
+        return self.model.lookup_cached_model(self.data)
     
     # the brute search
     @auto_attr
     def brute_force(self):
+        
+        # spread the grid over threads if the model asks for it
+        if hasattr(self.model, 'brute_force_threads'): # pragma: no cover
+            threads = self.model.brute_force_threads
+        else:
+            threads = 1
+        
+        # fill the HRF caches before the threads start, so that they only
+        # ever read them. the delay and TR are fixed during the search, so
+        # no thread will find the cache stale and write to it
+        if threads > 1 and hasattr(self.model, 'hrf_delay'): # pragma: no cover
+            self.model.convolve_hrf(np.zeros_like(self.data, dtype=np.double))
+        
         return utils.brute_force_search(self.data,
                                         utils.error_function,
                                         self.model.generate_ballpark_prediction,
                                         self.grids,
                                         self.Ns,
-                                        self.very_verbose)
+                                        self.very_verbose,
+                                        threads)
     
     @auto_attr
     def ballpark(self):
@@ -373,21 +509,38 @@ class PopulationFit(object):
     def scaled_ballpark_prediction(self):
         return self.ballpark_prediction * self.slope + self.intercept
     
+    @auto_attr
+    def ballpark_regression(self):
+        return self.model.regress(self.ballpark_prediction, self.data)
+    
     @auto_attr
     def slope(self):
-        return self.model.regress(self.ballpark_prediction, self.data)[0]
+        return self.ballpark_regression[0]
     
     @auto_attr
     def intercept(self):
-        return self.model.regress(self.ballpark_prediction, self.data)[1]
+        return self.ballpark_regression[1]
     
     @auto_attr
     def prediction(self):
         return self.model.generate_prediction(*self.estimate)
     
+    @auto_attr
+    def _data_mean(self):
+        return self.data.mean()
+    
+    @auto_attr
+    def _data_ss(self):
+        d = self.data - self._data_mean
+        return np.dot(d, d)
+    
     @auto_attr
     def rsquared(self):
-        return np.corrcoef(self.data, self.prediction)[1][0]**2
+        
+        # squared correlation, p sums to zero so the data needs no centering
+        p = self.prediction - self.prediction.mean()
+        r = np.dot(self.data, p)
+        return r**2 / (self._data_ss * np.dot(p, p))
     
     @auto_attr
     def rss(self):
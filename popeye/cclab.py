@@ -3,11 +3,8 @@
 """ Classes and functions for estimating Gaussian pRF model """
 
 from __future__ import division
-import warnings
-warnings.simplefilter("ignore")
 
 import numpy as np
-from scipy.signal import fftconvolve
 from scipy.stats import linregress
 import nibabel
 
@@ -45,7 +42,7 @@ class GaussianModel(PopulationModel):
         PopulationModel.__init__(self, stimulus, hrf_model, normalizer)
         
     # main method for deriving model time-series
-    def generate_ballpark_prediction(self, x, y, sigma):
+    def generate_ballpark_prediction(self, x, y, sigma, data=None):
         
         r"""
         Predict signal for the Gaussian Model using the downsampled stimulus.
@@ -62,6 +59,9 @@ class GaussianModel(PopulationModel):
         sigma: float
             Dipsersion of the Gaussian RF.
         
+        data : ndarray
+            The timeseries the prediction is scaled to, defaults to `self.data`.
+        
         """
         
         # mask for speed
@@ -69,19 +69,22 @@ class GaussianModel(PopulationModel):
         
         # generate the RF
         rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x0, self.stimulus.deg_y0)
-        rf /= (2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x0[0,0:2])**2
+        rf /= (2 * np.pi * sigma**2) / self.stimulus.pixel_area0
                 
         # extract the stimulus time-series
         response = generate_rf_timeseries(self.stimulus.stim_arr0, rf, mask)
         
         # convolve it with the stimulus
-        model = fftconvolve(response, self.hrf())[0:len(response)]
+        model = self.convolve_hrf(response)
         
         # units
         model = self.normalizer(model)
         
+        if data is None:
+            data = self.data
+        
         # regress out mean and amplitude
-        beta, baseline = self.regress(model, self.data)
+        beta, baseline = self.regress(model, data)
         
         # scale
         model *= beta
@@ -121,13 +124,13 @@ class GaussianModel(PopulationModel):
         
         # generate the RF
         rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x, self.stimulus.deg_y)
-        rf /= (2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x[0,0:2])**2
+        rf /= (2 * np.pi * sigma**2) / self.stimulus.pixel_area
         
         # extract the stimulus time-series
         response = generate_rf_timeseries(self.stimulus.stim_arr, rf, mask)
         
         # convolve it with the stimulus
-        model = fftconvolve(response, self.hrf())[0:len(response)]
+        model = self.convolve_hrf(response)
         
         # units
         model = self.normalizer(model)
@@ -163,7 +166,7 @@ class GaussianModel(PopulationModel):
         """
         
         rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x, self.stimulus.deg_y)
-        rf /= (2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x[0,0:2])**2
+        rf /= (2 * np.pi * sigma**2) / self.stimulus.pixel_area
         
         return rf
         
@@ -343,7 +346,7 @@ class CompressiveSpatialSummationModel(PopulationModel):
         PopulationModel.__init__(self, stimulus, hrf_model, cached_model_path, nuisance)
         
     # main method for deriving model time-series
-    def generate_ballpark_prediction(self, x, y, sigma, n):
+    def generate_ballpark_prediction(self, x, y, sigma, n, data=None):
         
         mask = self.distance_mask_coarse(x, y, sigma)
 
@@ -351,7 +354,7 @@ class CompressiveSpatialSummationModel(PopulationModel):
         rf = generate_og_receptive_field(x, y, sigma,self.stimulus.deg_x0, self.stimulus.deg_y0)
         
         # normalize by the integral
-        rf /= ((2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x0[0,0:2])**2)
+        rf /= ((2 * np.pi * sigma**2) / self.stimulus.pixel_area0)
         
         # extract the stimulus time-series
         response = generate_rf_timeseries(self.stimulus.stim_arr0, rf, mask)
@@ -360,15 +363,16 @@ class CompressiveSpatialSummationModel(PopulationModel):
         response **= n
         
         # convolve with the HRF
-        hrf = self.hrf_model(self.hrf_delay, self.stimulus.tr_length)
-        # convolve it with the stimulus
-        model = fftconvolve(response, hrf)[0:len(response)]
+        model = self.convolve_hrf(response)
         
         # units
         model = (model - np.mean(model)) / np.mean(model)
         
+        if data is None:
+            data = self.data
+        
         # regress out mean and linear
-        p = linregress(model, self.data)
+        p = linregress(model, data)
         
         # scale
         model *= p[0]
@@ -387,7 +391,7 @@ class CompressiveSpatialSummationModel(PopulationModel):
         rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x, self.stimulus.deg_y)
         
         # normalize by the integral
-        rf /= ((2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x[0,0:2])**2)
+        rf /= ((2 * np.pi * sigma**2) / self.stimulus.pixel_area)
         
         # extract the stimulus time-series
         response = generate_rf_timeseries(self.stimulus.stim_arr, rf, mask)
@@ -396,10 +400,7 @@ class CompressiveSpatialSummationModel(PopulationModel):
         response **= n
         
         # convolve with the HRF
-        hrf = self.hrf_model(self.hrf_delay, self.stimulus.tr_length)
-        
-        # convolve it with the stimulus
-        model = fftconvolve(response, hrf)[0:len(response)]
+        model = self.convolve_hrf(response)
         
         # convert units
         model = (model - np.mean(model)) / np.mean(model)
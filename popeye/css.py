@@ -3,11 +3,8 @@
 """ Classes and functions for estimating Compressive Spatial Summation pRF model """
 
 from __future__ import division
-import warnings
-warnings.simplefilter("ignore")
 
 import numpy as np
-from scipy.signal import fftconvolve
 from scipy.stats import linregress
 import nibabel
 
@@ -50,7 +47,7 @@ class CompressiveSpatialSummationModel(PopulationModel):
         PopulationModel.__init__(self, stimulus, hrf_model, cached_model_path, nuisance)
         
     # main method for deriving model time-series
-    def generate_ballpark_prediction(self, x, y, sigma, n):
+    def generate_ballpark_prediction(self, x, y, sigma, n, data=None):
         
         mask = self.distance_mask_coarse(x, y, sigma)
 
@@ -58,7 +55,7 @@ class CompressiveSpatialSummationModel(PopulationModel):
         rf = generate_og_receptive_field(x, y, sigma,self.stimulus.deg_x0, self.stimulus.deg_y0)
         
         # normalize by the integral
-        rf /= ((2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x0[0,0:2])**2)
+        rf /= ((2 * np.pi * sigma**2) / self.stimulus.pixel_area0)
         
         # extract the stimulus time-series
         response = generate_rf_timeseries(self.stimulus.stim_arr0, rf, mask)
@@ -67,15 +64,16 @@ class CompressiveSpatialSummationModel(PopulationModel):
         response **= n
         
         # convolve with the HRF
-        hrf = self.hrf_model(self.hrf_delay, self.stimulus.tr_length)
-        # convolve it with the stimulus
-        model = fftconvolve(response, hrf)[0:len(response)]
+        model = self.convolve_hrf(response)
         
         # units
         model = (model - np.mean(model)) / np.mean(model)
         
+        if data is None:
+            data = self.data
+        
         # regress out mean and linear
-        p = linregress(model, self.data)
+        p = linregress(model, data)
         
         # scale
         model *= p[0]
@@ -94,7 +92,7 @@ class CompressiveSpatialSummationModel(PopulationModel):
         rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x, self.stimulus.deg_y)
         
         # normalize by the integral
-        rf /= ((2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x[0,0:2])**2)
+        rf /= ((2 * np.pi * sigma**2) / self.stimulus.pixel_area)
         
         # extract the stimulus time-series
         response = generate_rf_timeseries(self.stimulus.stim_arr, rf, mask)
@@ -103,10 +101,7 @@ class CompressiveSpatialSummationModel(PopulationModel):
         response **= n
         
         # convolve with the HRF
-        hrf = self.hrf_model(self.hrf_delay, self.stimulus.tr_length)
-        
-        # convolve it with the stimulus
-        model = fftconvolve(response, hrf)[0:len(response)]
+        model = self.convolve_hrf(response)
         
         # convert units
         model = (model - np.mean(model)) / np.mean(model)
@@ -3,11 +3,8 @@
 """ Classes and functions for estimating Compressive Spatial Summation pRF model """
 
 from __future__ import division
-import warnings
-warnings.simplefilter("ignore")
 
 import numpy as np
-from scipy.signal import fftconvolve
 import nibabel
 
 from popeye.onetime import auto_attr
@@ -56,7 +53,7 @@ class CompressiveSpatialSummationModel(PopulationModel):
         rf = generate_og_receptive_field(x, y, sigma,self.stimulus.deg_x0, self.stimulus.deg_y0)
         
         # normalize by the integral
-        rf /= ((2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x0[0,0:2])**2)
+        rf /= ((2 * np.pi * sigma**2) / self.stimulus.pixel_area0)
         
         # extract the stimulus time-series
         response = generate_rf_timeseries_nomask(self.stimulus.stim_arr0, rf)
@@ -65,10 +62,7 @@ class CompressiveSpatialSummationModel(PopulationModel):
         response **= self.n()
         
         # convolve with the HRF
-        hrf = self.hrf_model(self.hrf_delay, self.stimulus.tr_length)
-        
-        # convolve it with the stimulus
-        model = fftconvolve(response, hrf)[0:len(response)]
+        model = self.convolve_hrf(response)
         
         # convert units
         model = (model - np.mean(model)) / np.mean(model)
@@ -85,7 +79,7 @@ class CompressiveSpatialSummationModel(PopulationModel):
         rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x, self.stimulus.deg_y)
         
         # normalize by the integral
-        rf /= ((2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x[0,0:2])**2)
+        rf /= ((2 * np.pi * sigma**2) / self.stimulus.pixel_area)
         
         # extract the stimulus time-series
         response = generate_rf_timeseries_nomask(self.stimulus.stim_arr, rf)
@@ -94,10 +88,7 @@ class CompressiveSpatialSummationModel(PopulationModel):
         response **= self.n()
         
         # convolve with the HRF
-        hrf = self.hrf_model(self.hrf_delay, self.stimulus.tr_length)
-        
-        # convolve it with the stimulus
-        model = fftconvolve(response, hrf)[0:len(response)]
+        model = self.convolve_hrf(response)
         
         # convert units
         model = (model - np.mean(model)) / np.mean(model)
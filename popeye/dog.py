@@ -4,13 +4,10 @@
 
 from __future__ import division, print_function, absolute_import
 import time
-import warnings
-warnings.simplefilter("ignore")
 
 import numpy as np
 np.set_printoptions(suppress=True)
 from scipy.stats import linregress
-from scipy.signal import fftconvolve
 from scipy.integrate import trapz
 
 import nibabel
@@ -54,7 +51,7 @@ class DifferenceOfGaussiansModel(PopulationModel):
         PopulationModel.__init__(self, stimulus, hrf_model, normalizer)
         
         
-    def generate_ballpark_prediction(self, x, y, sigma, sigma_ratio, volume_ratio):
+    def generate_ballpark_prediction(self, x, y, sigma, sigma_ratio, volume_ratio, data=None):
         
         # extract the center response
         rf_center = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x0, self.stimulus.deg_y0)
@@ -70,17 +67,17 @@ class DifferenceOfGaussiansModel(PopulationModel):
         mask = self.distance_mask(x, y, sigma*sigma_ratio)
         response = generate_rf_timeseries(self.stimulus.stim_arr0, rf, mask)
         
-        # generate the hrf
-        hrf = self.hrf_model(self.hrf_delay, self.stimulus.tr_length)
-        
-        # convolve it
-        model = fftconvolve(response, hrf)[0:len(response)]
+        # convolve with the HRF
+        model = self.convolve_hrf(response)
         
         # units
         model = self.normalizer(model)
         
+        if data is None:
+            data = self.data
+        
         # regress out mean and linear
-        beta, baseline = self.regress(model, self.data)
+        beta, baseline = self.regress(model, data)
         
         # scale
         model *= beta
@@ -106,11 +103,8 @@ class DifferenceOfGaussiansModel(PopulationModel):
         mask = self.distance_mask(x, y, sigma*sigma_ratio)
         response = generate_rf_timeseries(self.stimulus.stim_arr, rf, mask)
         
-        # generate the hrf
-        hrf = self.hrf_model(self.hrf_delay, self.stimulus.tr_length)
-        
-        # convolve it
-        model = fftconvolve(response, hrf)[0:len(response)]
+        # convolve with the HRF
+        model = self.convolve_hrf(response)
         
         # units
         model = self.normalizer(model)
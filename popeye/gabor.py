@@ -3,8 +3,6 @@
 """ Classes and functions for fitting population encoding models """
 
 from __future__ import division
-import warnings
-warnings.simplefilter("ignore")
 
 import numpy as np
 from scipy.signal import fftconvolve
@@ -36,8 +34,7 @@ class GaborModel(PopulationModel):
         
         # create mask for speed
         distance = (self.stimulus.deg_x0 - x)**2 + (self.stimulus.deg_y0 - y)**2
-        mask = np.zeros_like(distance, dtype='uint8')
-        mask[distance < (5*sigma)**2] = 1
+        mask = (distance < (5*sigma)**2).view('uint8')
         
         # generate the RF
         rf = generate_gabor_receptive_field(x, y, sigma, theta, phi, cpd,
@@ -64,8 +61,7 @@ class GaborModel(PopulationModel):
         
         # create mask for speed
         distance = (self.stimulus.deg_x - x)**2 + (self.stimulus.deg_y - y)**2
-        mask = np.zeros_like(distance, dtype='uint8')
-        mask[distance < (5*sigma)**2] = 1
+        mask = (distance < (5*sigma)**2).view('uint8')
         
         # generate the RF
         rf = generate_gabor_receptive_field(x, y, sigma, theta, phi, cpd,
@@ -3,8 +3,6 @@
 """ Classes and functions for estimating Gaussian pRF model """
 
 from __future__ import division
-import warnings
-warnings.simplefilter("ignore")
 
 import numpy as np
 from scipy.signal import fftconvolve
@@ -48,7 +46,7 @@ class GaussianModel(PopulationModel):
         PopulationModel.__init__(self, stimulus, hrf_model, normalizer)
     
     # main method for deriving model time-series
-    def generate_ballpark_prediction(self, x, y, sigma, hrf_delay):
+    def generate_ballpark_prediction(self, x, y, sigma, hrf_delay, data=None):
         
         r"""
         Predict signal for the Gaussian Model using the downsampled stimulus.
@@ -70,6 +68,9 @@ class GaussianModel(PopulationModel):
             cannonical HRF delay is 5 s, and that this parameter is a deviation
             +/- that 5 s.
         
+        data : ndarray
+            The timeseries the prediction is scaled to, defaults to `self.data`.
+        
         """
         
         # mask for speed
@@ -77,7 +78,7 @@ class GaussianModel(PopulationModel):
         
         # generate the RF
         rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x0, self.stimulus.deg_y0)
-        rf /= (2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x0[0,0:2])**2
+        rf /= (2 * np.pi * sigma**2) / self.stimulus.pixel_area0
                 
         # extract the stimulus time-series
         response = generate_rf_timeseries(self.stimulus.stim_arr0, rf, mask)
@@ -89,8 +90,11 @@ class GaussianModel(PopulationModel):
         # units
         model = self.normalizer(model)
         
+        if data is None:
+            data = self.data
+        
         # regress out mean and linear
-        p = linregress(model, self.data)
+        p = linregress(model, data)
         
         # scale
         model *= p[0]
@@ -134,7 +138,7 @@ class GaussianModel(PopulationModel):
         
         # generate the RF
         rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x, self.stimulus.deg_y)
-        rf /= (2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x[0,0:2])**2
+        rf /= (2 * np.pi * sigma**2) / self.stimulus.pixel_area
         
         # extract the stimulus time-series
         response = generate_rf_timeseries(self.stimulus.stim_arr, rf, mask)
@@ -176,7 +180,7 @@ class GaussianModel(PopulationModel):
         """
         
         rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x, self.stimulus.deg_y)
-        rf /= (2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x[0,0:2])**2
+        rf /= (2 * np.pi * sigma**2) / self.stimulus.pixel_area
         
         return rf
         
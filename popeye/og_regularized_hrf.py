@@ -3,8 +3,6 @@
 """ Classes and functions for estimating Gaussian pRF model """
 
 from __future__ import division
-import warnings
-warnings.simplefilter("ignore")
 
 import numpy as np
 from scipy.signal import fftconvolve
@@ -45,7 +43,7 @@ class GaussianModel(PopulationModel):
         PopulationModel.__init__(self, stimulus, hrf_model, nuisance)
         
     # main method for deriving model time-series
-    def generate_ballpark_prediction(self, x, y, sigma):
+    def generate_ballpark_prediction(self, x, y, sigma, data=None):
         
         r"""
         Predict signal for the Gaussian Model using the downsampled stimulus.
@@ -62,6 +60,9 @@ class GaussianModel(PopulationModel):
         sigma: float
             Dipsersion of the Gaussian RF.
         
+        data : ndarray
+            The timeseries the prediction is scaled to, defaults to `self.data`.
+        
         """
         
         # mask for speed
@@ -69,19 +70,22 @@ class GaussianModel(PopulationModel):
         
         # generate the RF
         rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x0, self.stimulus.deg_y0)
-        rf /= (2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x0[0,0:2])**2
+        rf /= (2 * np.pi * sigma**2) / self.stimulus.pixel_area0
                 
         # extract the stimulus time-series
         response = generate_rf_timeseries(self.stimulus.stim_arr0, rf, mask)
         
         # convolve it with the stimulus
-        model = fftconvolve(response, self.hrf())[0:len(response)]
+        model = self.convolve_hrf(response)
         
         # units
         model = (model-np.mean(model)) / np.mean(model)
         
+        if data is None:
+            data = self.data
+        
         # regress out mean and linear
-        p = linregress(model, self.data)
+        p = linregress(model, data)
         
         # scale
         model *= p[0]
@@ -116,7 +120,7 @@ class GaussianModel(PopulationModel):
         
         # generate the RF
         rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x, self.stimulus.deg_y)
-        rf /= (2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x[0,0:2])**2
+        rf /= (2 * np.pi * sigma**2) / self.stimulus.pixel_area
         
         # extract the stimulus time-series
         response = generate_rf_timeseries(self.stimulus.stim_arr, rf, mask)
@@ -161,7 +165,7 @@ class GaussianModel(PopulationModel):
         """
         
         rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x, self.stimulus.deg_y)
-        rf /= (2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x[0,0:2])**2
+        rf /= (2 * np.pi * sigma**2) / self.stimulus.pixel_area
         
         return rf
             
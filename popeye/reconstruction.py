@@ -32,7 +32,7 @@ def reconstruct_stimulus(metaData,stimData,funcData,verbose=True):
     for xvoxel,yvoxel,zvoxel in zip(xi,yi,zi):
         
         # Grab timestamp
-        toc = time.clock()
+        toc = time.perf_counter()
         
         # grab the pRF estimate for this voxel
         pRFx,pRFy,pRFs,pRFd = funcData['pRF_polar'][xvoxel,yvoxel,zvoxel,0:4]
@@ -55,7 +55,7 @@ def reconstruct_stimulus(metaData,stimData,funcData,verbose=True):
                 stimData['stimRecon'][:,:,tr] += intensity*rf
         
         # Grab a timestamp
-        tic = time.clock()
+        tic = time.perf_counter()
         
         if verbose:
             percentDone = (voxelCount/numVoxels)*100
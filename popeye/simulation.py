@@ -64,7 +64,7 @@ def error_function(neural_sigma, voxel_sigma, voxel_rf, deg_x, deg_y, xs, ys):
 def simulate_neural_sigma(estimate, scatter, deg_x, deg_y, voxel_index, num_neurons=1000, verbose=True):
     
     # timestamp
-    start = time.clock()
+    start = time.perf_counter()
     
     # unpack
     x = estimate[0]
@@ -88,7 +88,7 @@ def simulate_neural_sigma(estimate, scatter, deg_x, deg_y, voxel_index, num_neur
     sigma_phat = fmin_powell(error_function, sigma, args=(sigma, voxel_rf, deg_x, deg_y, xs, ys),full_output=True,disp=False)
     
     # timestamp
-    finish = time.clock()
+    finish = time.perf_counter()
     
     # progress
     if verbose:
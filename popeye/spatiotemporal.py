@@ -5,13 +5,11 @@
 from __future__ import division, print_function, absolute_import
 import time
 import gc
-import warnings
-warnings.simplefilter("ignore")
 
 import numpy as np
 from scipy.stats import linregress
-from scipy.signal import fftconvolve
-from scipy.integrate import trapz, simps
+from scipy.fft import rfft, irfft, next_fast_len
+from scipy.integrate import simps
 from scipy.optimize import fmin
 import nibabel
 
@@ -44,7 +42,7 @@ class SpatioTemporalModel(PopulationModel):
         
         PopulationModel.__init__(self, stimulus, hrf_model, normalizer)
         
-    def generate_ballpark_prediction(self, x, y, sigma, weight):
+    def generate_ballpark_prediction(self, x, y, sigma, weight, data=None):
         
         r"""
         Predict signal for the Gaussian Model using the downsampled stimulus.
@@ -67,13 +65,16 @@ class SpatioTemporalModel(PopulationModel):
             with 0 being a totally magnocellular response and ` being a totally
             parvocellular response.
         
+        data : ndarray
+            The timeseries the prediction is scaled to, defaults to `self.data`.
+        
         """
         # mask for speed
         mask = self.distance_mask_coarse(x, y, sigma)
         
         # generate the RF
         spatial_rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x0, self.stimulus.deg_y0)
-        spatial_rf /= ((2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x0[0,0:2])**2)
+        spatial_rf /= ((2 * np.pi * sigma**2) / self.stimulus.pixel_area0)
         
         # spatial_response
         spatial_ts = generate_rf_timeseries(self.stimulus.stim_arr0, spatial_rf, mask)
@@ -81,17 +82,22 @@ class SpatioTemporalModel(PopulationModel):
         # temporal response
         m_ts, p_ts = generate_mp_timeseries(spatial_ts, self.m_amp, self.p_amp, self.stimulus.flicker_vec)
         
-        # mix them
-        mp_ts = (1-weight) * m_ts + weight * p_ts
+        # mix them in place, both arrays are fresh from generate_mp_timeseries
+        m_ts *= 1-weight
+        p_ts *= weight
+        mp_ts = np.add(m_ts, p_ts, out=m_ts)
         
         # convolve with HRF
-        model = fftconvolve(mp_ts, self.hrf())[0:len(mp_ts)]
+        model = self.convolve_hrf(mp_ts)
         
         # units
         model = self.normalizer(model)
         
+        if data is None:
+            data = self.data
+        
         # regress out mean and linear
-        p = linregress(model, self.data)
+        p = linregress(model, data)
         
         # scale
         model *= p[0]
@@ -136,7 +142,7 @@ class SpatioTemporalModel(PopulationModel):
         
         # generate the RF
         spatial_rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x, self.stimulus.deg_y)
-        spatial_rf /= ((2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x[0,0:2])**2)
+        spatial_rf /= ((2 * np.pi * sigma**2) / self.stimulus.pixel_area)
         
         # spatial response
         spatial_ts = generate_rf_timeseries(self.stimulus.stim_arr, spatial_rf, mask)
@@ -144,11 +150,13 @@ class SpatioTemporalModel(PopulationModel):
         # temporal response
         m_ts, p_ts = generate_mp_timeseries(spatial_ts, self.m_amp, self.p_amp, self.stimulus.flicker_vec)
         
-        # mix them
-        mp_ts = (1-weight) * m_ts + weight * p_ts 
+        # mix them in place, both arrays are fresh from generate_mp_timeseries
+        m_ts *= 1-weight
+        p_ts *= weight
+        mp_ts = np.add(m_ts, p_ts, out=m_ts)
         
         # convolve with HRF
-        model = fftconvolve(mp_ts, self.hrf())[0:len(mp_ts)]
+        model = self.convolve_hrf(mp_ts)
         
         # units
         model = self.normalizer(model)
@@ -181,8 +189,12 @@ class SpatioTemporalModel(PopulationModel):
         r"""Returns the magnocellar transient receptive field. The temporal dispersion
         parameter `tau` must be hard-set in the `SpatioTemporalModel.tau` by the user."""
         
-        m = np.insert(np.diff(self.p),0,0)
-        m = m/(simps(np.abs(m),self.t))
+        # forward difference of p, written straight into the kernel
+        m = np.empty_like(self.p)
+        m[0] = 0
+        np.subtract(self.p[1:], self.p[:-1], out=m[1:])
+        
+        m /= simps(np.abs(m),self.t)
         return m
     
     def p_rf(self, tau):
@@ -228,8 +240,12 @@ class SpatioTemporalModel(PopulationModel):
         """
         
         p = self.p_rf(tau)
-        m = np.insert(np.diff(p),0,0)
-        m = m/(simps(np.abs(m),self.t))
+        # forward difference of p, written straight into the kernel
+        m = np.empty_like(p)
+        m[0] = 0
+        np.subtract(p[1:], p[:-1], out=m[1:])
+        
+        m /= simps(np.abs(m),self.t)
         
         return m
     
@@ -238,7 +254,7 @@ class SpatioTemporalModel(PopulationModel):
         
         r""" Returns the time coordinate."""
         
-        return np.linspace(0, self.stimulus.tr_length, self.stimulus.fps * self.stimulus.tr_length)
+        return np.linspace(0, self.stimulus.tr_length, int(self.stimulus.fps * self.stimulus.tr_length))
     
     @auto_attr
     def center(self):
@@ -254,12 +270,44 @@ class SpatioTemporalModel(PopulationModel):
         
         return np.sin(2 * np.pi * np.single(self.stimulus.flicker_hz) * self.t[:,np.newaxis])
     
+    @auto_attr
+    def flickers_fft(self):
+        
+        r""" Returns the spectrum of the flicker profiles and its FFT length, computed
+        once and shared by all of the temporal responses."""
+        
+        nfft = next_fast_len(2*len(self.t)-1, True)
+        return rfft(self.flickers, nfft, axis=0), nfft
+    
+    def convolve_flickers(self, kernel):
+        
+        r""" Returns the full convolution of the flicker profiles with a temporal kernel,
+        the same as `fftconvolve(self.flickers, kernel[:,np.newaxis])`.
+        
+        Parameters
+        ----------
+        
+        kernel : ndarray
+            A temporal receptive field, sampled on `self.t`.
+        
+        Returns
+        -------
+        
+        resp : ndarray
+            The temporal response to each of the flickering stimuli.
+        
+        """
+        
+        flickers_fft, nfft = self.flickers_fft
+        resp = irfft(flickers_fft * rfft(kernel, nfft)[:,np.newaxis], nfft, axis=0)
+        return resp[0:len(self.t)+len(kernel)-1]
+    
     @auto_attr
     def m_resp(self):
         
         r""" Returns the transient magnocellular response to flicker stimulus."""
         
-        m_resp = fftconvolve(self.flickers,self.m[:,np.newaxis])
+        m_resp = self.convolve_flickers(self.m)
         m_resp= utils.normalize(m_resp,-1,1)
         return m_resp
         
@@ -283,7 +331,7 @@ class SpatioTemporalModel(PopulationModel):
         """
         
         m_rf = self.m_rf(tau)
-        m_resp = fftconvolve(self.flickers,m_rf[:,np.newaxis])
+        m_resp = self.convolve_flickers(m_rf)
         m_resp = utils.normalize(m_resp,-1,1)
         return m_resp
         
@@ -301,7 +349,7 @@ class SpatioTemporalModel(PopulationModel):
         
         r""" Returns the sustained parvocellular response to flicker stimulus."""
         
-        p_resp = fftconvolve(self.flickers,self.p[:,np.newaxis])
+        p_resp = self.convolve_flickers(self.p)
         p_resp = utils.normalize(p_resp,-1,1)
         return p_resp
         
@@ -325,7 +373,7 @@ class SpatioTemporalModel(PopulationModel):
         """
         
         p_rf = self.p_rf(tau)
-        p_resp = fftconvolve(self.flickers,p_rf[:,np.newaxis])
+        p_resp = self.convolve_flickers(p_rf)
         p_resp = utils.normalize(p_resp,-1,1)
         return p_resp
     
@@ -357,7 +405,7 @@ class SpatioTemporalModel(PopulationModel):
         """
         
         rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x, self.stimulus.deg_y)
-        rf /= (2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x[0,0:2])**2
+        rf /= (2 * np.pi * sigma**2) / self.stimulus.pixel_area
         
         return rf
 
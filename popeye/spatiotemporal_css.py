@@ -5,13 +5,11 @@
 from __future__ import division, print_function, absolute_import
 import time
 import gc
-import warnings
-warnings.simplefilter("ignore")
 
 import numpy as np
 from scipy.stats import linregress
-from scipy.signal import fftconvolve
-from scipy.integrate import trapz, simps
+from scipy.fft import rfft, irfft, next_fast_len
+from scipy.integrate import simps
 import nibabel
 
 from popeye.onetime import auto_attr
@@ -52,14 +50,14 @@ class SpatioTemporalModel(PopulationModel):
         
         
     # for the final solution, we use spatiotemporal
-    def generate_ballpark_prediction(self, x, y, sigma, n, weight):
+    def generate_ballpark_prediction(self, x, y, sigma, n, weight, data=None):
         
         # mask for speed
         mask = self.distance_mask_coarse(x, y, sigma)
         
         # generate the RF
         spatial_rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x0, self.stimulus.deg_y0)
-        spatial_rf /= ((2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x0[0,0:2])**2)
+        spatial_rf /= ((2 * np.pi * sigma**2) / self.stimulus.pixel_area0)
         
         # spatial_response
         spatial_ts = generate_rf_timeseries(self.stimulus.stim_arr0, spatial_rf, mask)
@@ -70,18 +68,23 @@ class SpatioTemporalModel(PopulationModel):
         # temporal response
         m_ts, p_ts = generate_mp_timeseries(spatial_ts, self.m_amp, self.p_amp, self.stimulus.flicker_vec)
         
-        # mix them
-        mp_ts = (1-weight) * m_ts + weight * p_ts
+        # mix them in place, both arrays are fresh from generate_mp_timeseries
+        m_ts *= 1-weight
+        p_ts *= weight
+        mp_ts = np.add(m_ts, p_ts, out=m_ts)
         
         # convolve with HRF
-        model = fftconvolve(mp_ts, self.hrf())[0:len(mp_ts)]
+        model = self.convolve_hrf(mp_ts)
         
         # units
         # model = (model - np.mean(model)) / np.mean(model)
         model = self.normalizer(model)
         
+        if data is None:
+            data = self.data
+        
         # regress out mean and linear
-        p = linregress(model, self.data)
+        p = linregress(model, data)
         
         # scale
         model *= p[0]
@@ -99,7 +102,7 @@ class SpatioTemporalModel(PopulationModel):
         
         # generate the RF
         spatial_rf = generate_og_receptive_field(x, y, sigma, self.stimulus.deg_x, self.stimulus.deg_y)
-        spatial_rf /= ((2 * np.pi * sigma**2) * 1/np.diff(self.stimulus.deg_x[0,0:2])**2)
+        spatial_rf /= ((2 * np.pi * sigma**2) / self.stimulus.pixel_area)
         
         # spatial response
         spatial_ts = generate_rf_timeseries(self.stimulus.stim_arr, spatial_rf, mask)
@@ -110,11 +113,13 @@ class SpatioTemporalModel(PopulationModel):
         # temporal response
         m_ts, p_ts = generate_mp_timeseries(spatial_ts, self.m_amp, self.p_amp, self.stimulus.flicker_vec)
         
-        # mix them
-        mp_ts = (1-weight) * m_ts + weight * p_ts
+        # mix them in place, both arrays are fresh from generate_mp_timeseries
+        m_ts *= 1-weight
+        p_ts *= weight
+        mp_ts = np.add(m_ts, p_ts, out=m_ts)
         
         # convolve with HRF
-        model = fftconvolve(mp_ts, self.hrf())[0:len(mp_ts)]
+        model = self.convolve_hrf(mp_ts)
         
         # convert units
         model = self.normalizer(model)
@@ -138,8 +143,12 @@ class SpatioTemporalModel(PopulationModel):
         
     @auto_attr
     def m(self):
-        m = np.insert(np.diff(self.p),0,0)
-        m = m/(simps(np.abs(m),self.t))
+        # forward difference of p, written straight into the kernel
+        m = np.empty_like(self.p)
+        m[0] = 0
+        np.subtract(self.p[1:], self.p[:-1], out=m[1:])
+        
+        m /= simps(np.abs(m),self.t)
         return m
 
     def p_rf(self, tau):
@@ -149,13 +158,17 @@ class SpatioTemporalModel(PopulationModel):
 
     def m_rf(self, tau):
         p = self.p_rf(tau)
-        m = np.insert(np.diff(p),0,0)
-        m = m/(simps(np.abs(m),self.t))
+        # forward difference of p, written straight into the kernel
+        m = np.empty_like(p)
+        m[0] = 0
+        np.subtract(p[1:], p[:-1], out=m[1:])
+        
+        m /= simps(np.abs(m),self.t)
         return m
 
     @auto_attr
     def t(self):
-        return np.linspace(0, self.stimulus.tr_length, self.stimulus.fps * self.stimulus.tr_length)
+        return np.linspace(0, self.stimulus.tr_length, int(self.stimulus.fps * self.stimulus.tr_length))
 
     @auto_attr
     def center(self):
@@ -165,15 +178,25 @@ class SpatioTemporalModel(PopulationModel):
     def flickers(self):
         return np.sin(2 * np.pi * np.single(self.stimulus.flicker_hz) * self.t[:,np.newaxis])
 
+    @auto_attr
+    def flickers_fft(self):
+        nfft = next_fast_len(2*len(self.t)-1, True)
+        return rfft(self.flickers, nfft, axis=0), nfft
+    
+    def convolve_flickers(self, kernel):
+        flickers_fft, nfft = self.flickers_fft
+        resp = irfft(flickers_fft * rfft(kernel, nfft)[:,np.newaxis], nfft, axis=0)
+        return resp[0:len(self.t)+len(kernel)-1]
+
     @auto_attr
     def m_resp(self):
-        m_resp = fftconvolve(self.flickers,self.m[:,np.newaxis])
+        m_resp = self.convolve_flickers(self.m)
         m_resp= utils.normalize(m_resp,-1,1)
         return m_resp
 
     def generate_m_resp(self, tau):
         m_rf = self.m_rf(tau)
-        m_resp = fftconvolve(self.flickers,m_rf[:,np.newaxis])
+        m_resp = self.convolve_flickers(m_rf)
         m_resp = utils.normalize(m_resp,-1,1)
         return m_resp
 
@@ -185,13 +208,13 @@ class SpatioTemporalModel(PopulationModel):
 
     @auto_attr
     def p_resp(self):
-        p_resp = fftconvolve(self.flickers,self.p[:,np.newaxis])
+        p_resp = self.convolve_flickers(self.p)
         p_resp = utils.normalize(p_resp,-1,1)
         return p_resp
 
     def generate_p_resp(self, tau):
         p_rf = self.p_rf(tau)
-        p_resp = fftconvolve(self.flickers,p_rf[:,np.newaxis])
+        p_resp = self.convolve_flickers(p_rf)
         p_resp = utils.normalize(p_resp,-1,1)
         return p_resp
 
@@ -293,7 +316,7 @@ class SpatioTemporalFit(PopulationFit):
                                           self.model.stimulus.deg_x,
                                           self.model.stimulus.deg_y)
                                           
-        rf /= ((2 * np.pi * self.sigma**2) * 1/np.diff(self.model.stimulus.deg_x0[0,0:2])**2)
+        rf /= ((2 * np.pi * self.sigma**2) / self.model.stimulus.pixel_area0)
         
         return rf
 
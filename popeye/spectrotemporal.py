@@ -4,9 +4,7 @@
 
 from __future__ import division
 import time
-import warnings
 import gc
-warnings.simplefilter("ignore")
 
 import numpy as np
 from scipy.optimize import brute, fmin_powell
@@ -15,7 +13,6 @@ from scipy.stats import linregress
 from scipy.signal import fftconvolve, decimate
 from scipy.ndimage.filters import median_filter
 from scipy.integrate import romb, trapz
-from scipy.interpolate import interp1d
 import nibabel
 
 from popeye.onetime import auto_attr
@@ -34,14 +31,15 @@ def recast_estimation_results(output, grid_parent, write=True):
     nii_out = np.zeros(dims)
     
     # extract the pRF model estimates from the results queue output
-    for fit in output:
-        if fit.__dict__.has_key('OLS'):
-            nii_out[fit.voxel_index] = (fit.center_freq, 
-                                        fit.sigma,
-                                        fit.rsquared,
-                                        fit.coefficient,
-                                        fit.stderr)
-                                 
+    fits = [fit for fit in output if 'OLS' in fit.__dict__]
+    if fits:
+        idx = np.array([fit.voxel_index for fit in fits], dtype=np.intp)
+        nii_out[tuple(idx.T)] = [(fit.center_freq,
+                                  fit.sigma,
+                                  fit.rsquared,
+                                  fit.coefficient,
+                                  fit.stderr) for fit in fits]
+    
     # get header information from the gridParent and update for the pRF volume
     aff = grid_parent.get_affine()
     hdr = grid_parent.get_header()
@@ -71,42 +69,67 @@ def gaussian_1D(freqs, center_freq, sigma):
     
     return gaussian
 
-def compute_model_ts(center_freq, sigma,
-                     spectrogram, freqs, target_times):
+# the HRF only depends on its delay and sampling, not on the pRF parameters,
+# so it is built once per (delay, tr, fptr) instead of on every call
+_hrf_cache = {}
+
+def cached_double_gamma_hrf(delay, tr, fptr=1.0):
     
-    # generate stimulus time-series
-    rf = gaussian_1D(freqs, center_freq, sigma)
-    # make sure sigma isn't too big
-    # if np.any(np.round(rf[0],3) > 0):
-    #     return np.inf
-    # if np.any(np.round(rf[-1],3) > 0):
-    #     return np.inf
-    
-    # create mask for speed
-    distance = freqs - center_freq
-    mask = np.zeros_like(distance, dtype='uint8')
-    mask[distance < (5*sigma)] = 1
-        
-    # extract the response
-    stim = generate_rf_timeseries_1D(spectrogram,rf,mask)
+    key = (delay, tr, fptr)
+    if key not in _hrf_cache:
+        _hrf_cache[key] = utils.double_gamma_hrf(delay, tr, fptr)
+    return _hrf_cache[key]
+
+def make_predictor(spectrogram, freqs, target_times):
     
-    # recast the stimulus into a time-series that i can 
-    source_times = np.linspace(0,target_times[-1],len(stim),endpoint=True)
-    f = interp1d(source_times,stim,kind='linear')
-    new_stim = f(target_times)
+    r"""
+    Returns a model time-series function specialized to one stimulus.
+    
+    Everything but the spectral RF is fixed for a given stimulus, so the
+    source time axis and the HRF are worked out once here and captured.
+    The returned callable takes only `(center_freq, sigma)`, which is the
+    signature the `utilities` search functions expect.
+    
+    """
+    
+    # recast the stimulus into a time-series that i can
+    source_times = np.linspace(0,target_times[-1],spectrogram.shape[1],endpoint=True)
     
     # hard-set the hrf_delay
     hrf_delay = 0
+    hrf = cached_double_gamma_hrf(hrf_delay, 1.0, 10)
+    n = len(target_times)
     
-    # convolve it with the HRF
-    hrf = utils.double_gamma_hrf(hrf_delay, 1.0, 10)
-    stim_pad = np.tile(new_stim,3)
-    model = fftconvolve(stim_pad, hrf,'same')[len(new_stim):len(new_stim)*2]
+    def predict(center_freq, sigma):
+        
+        # generate stimulus time-series
+        rf = gaussian_1D(freqs, center_freq, sigma)
+        
+        # create mask for speed
+        distance = freqs - center_freq
+        mask = (distance < (5*sigma)).view('uint8')
+        
+        # extract the response
+        stim = generate_rf_timeseries_1D(spectrogram,rf,mask)
+        
+        # linear resampling onto the target times
+        new_stim = np.interp(target_times, source_times, stim)
+        
+        # convolve it with the HRF
+        stim_pad = np.tile(new_stim,3)
+        model = fftconvolve(stim_pad, hrf,'same')[n:n*2]
+        
+        # normalize it
+        model = utils.zscore(model)
+        
+        return model
     
-    # normalize it
-    model = utils.zscore(model)
+    return predict
+
+def compute_model_ts(center_freq, sigma,
+                     spectrogram, freqs, target_times):
     
-    return model
+    return make_predictor(spectrogram, freqs, target_times)(center_freq, sigma)
 
 # this method is used to simply multiprocessing.Pool interactions
 def parallel_fit(args):
@@ -157,18 +180,18 @@ class SpectroTemporalFit(PopulationFit):
         
         if self.auto_fit:
             
-            self.start = time.clock()
+            self.start = time.perf_counter()
             try:
                 self.ballpark;
                 self.estimate;
                 self.OLS;
-                self.finish = time.clock()
+                self.finish = time.perf_counter()
                 
                 if self.verbose:
                     print(self.msg)
                     
             except:
-                self.finish = time.clock()
+                self.finish = time.perf_counter()
                 if self.verbose:
                     print(self.errmsg)
     
@@ -239,19 +262,28 @@ class SpectroTemporalFit(PopulationFit):
     
     @auto_attr
     def OLS(self):
-        return sm.OLS(self.data,self.prediction).fit()
+        
+        # single-regressor least squares through the origin, giving the
+        # same slope, uncentered r-squared and residual variance as statsmodels
+        x = self.prediction
+        y = self.data
+        xx = np.dot(x, x)
+        xy = np.dot(x, y)
+        yy = np.dot(y, y)
+        sse = yy - xy**2 / xx
+        return xy / xx, 1 - sse / yy, sse / (len(y) - 1)
     
     @auto_attr
     def coefficient(self):
-        return self.OLS.params[0]
+        return self.OLS[0]
     
     @auto_attr
     def rsquared(self):
-        return self.OLS.rsquared
+        return self.OLS[1]
     
     @auto_attr
     def stderr(self):
-        return np.sqrt(self.OLS.mse_resid)
+        return np.sqrt(self.OLS[2])
     
     @auto_attr
     def rss(self):
@@ -259,7 +291,7 @@ class SpectroTemporalFit(PopulationFit):
     
     @auto_attr
     def receptive_field(self):
-        return gaussian_1D(self.model.stimulus.freqs, self.center_freq,)
+        return gaussian_1D(self.model.stimulus.freqs, self.center_freq, self.sigma)
     
     @auto_attr
     def msg(self):
@@ -251,12 +251,13 @@ def generate_rf_timeseries(np.ndarray[DTYPE3_t, ndim=3] stim_arr,
     # initialize output variable
     cdef np.ndarray[DTYPE2_t,ndim=1,mode='c'] stim = np.zeros(zlim,dtype=DTYPE2)
 
-    # the loop
-    for i in xrange(xlim):
-        for j in xrange(ylim):
-            if mask[i,j] == 1:
-                for k in xrange(zlim):
-                    stim[k] += stim_arr[i,j,k]*rf[i,j]
+    # the loop, no python objects are touched so other threads can run
+    with nogil:
+        for i in range(xlim):
+            for j in range(ylim):
+                if mask[i,j] == 1:
+                    for k in range(zlim):
+                        stim[k] += stim_arr[i,j,k]*rf[i,j]
 
     return stim
 
@@ -275,10 +276,11 @@ def generate_rf_timeseries_1D(np.ndarray[DTYPE2_t, ndim=2] stim_arr,
     cdef np.ndarray[DTYPE2_t,ndim=1,mode='c'] stim = np.zeros(ylim,dtype=DTYPE2)
 
     # the loop
-    for i in xrange(xlim):
-        if mask[i] == 1:
-            for j in xrange(ylim):
-                stim[j] += stim_arr[i,j]*rf[i]
+    with nogil:
+        for i in range(xlim):
+            if mask[i] == 1:
+                for j in range(ylim):
+                    stim[j] += stim_arr[i,j]*rf[i]
 
     return stim
 
@@ -592,10 +594,11 @@ def generate_og_receptive_field(DTYPE2_t x, DTYPE2_t y, DTYPE2_t sigma,
     cdef np.ndarray[DTYPE2_t, ndim=2, mode='c'] rf = np.zeros((xlim,ylim),dtype=DTYPE2)
 
     # the loop
-    for i in xrange(xlim):
-        for j in xrange(ylim):
-            d = (deg_x[i,j]-x)**2 + (deg_y[i,j]-y)**2
-            rf[i,j] = exp(-d/s_factor2)
+    with nogil:
+        for i in range(xlim):
+            for j in range(ylim):
+                d = (deg_x[i,j]-x)**2 + (deg_y[i,j]-y)**2
+                rf[i,j] = exp(-d/s_factor2)
 
     return rf
 
@@ -1,15 +1,12 @@
 import ctypes
 
-import matplotlib
-from matplotlib.pyplot import specgram
-
 import numpy as np
 import numpy.testing as npt
-from scipy.signal import chirp
+from scipy.signal import chirp, spectrogram
 
 import popeye.utilities as utils
 import popeye.auditory as aud
-from popeye.auditory_stimulus import AuditoryStimulus
+from popeye.auditory_stimulus import AuditoryStimulus, generate_spectrogram
 
 def test_auditory_fit():
     
@@ -92,6 +89,34 @@ def test_auditory_fit():
     # test model == fit RF
     rf = np.exp(-((fit.model.stimulus.freqs-fit.center_freq)**2)/(2*fit.sigma**2))
     rf /= (fit.sigma*np.sqrt(2*np.pi))
-    npt.assert_almost_equal(np.round(rf.sum()), np.round(fit.receptive_field_log10.sum())) 
+    npt.assert_almost_equal(np.round(rf.sum()), np.round(fit.receptive_field_log10.sum()))
+
+def test_generate_spectrogram():
     
+    # stimulus features
+    duration = 5 # seconds
+    Fs = int(44100/2) # Hz
+    tr_length = 1.0 # seconds
     
+    # generate auditory stimulus
+    time = np.linspace(0,duration,duration*Fs)
+    signal = chirp(time, 200.0, duration, 10000.0, method='logarithmic')
+    
+    # reference spectrogram
+    freqs, times, spec = spectrogram(signal, Fs, nperseg=Fs, noverlap=0, nfft=Fs)
+    
+    # popeye spectrogram
+    popeye_spec, popeye_freqs, popeye_times = generate_spectrogram(signal, Fs, tr_length, decibels=False)
+    
+    # assert equivalence
+    npt.assert_equal(popeye_spec.shape, spec.shape)
+    npt.assert_almost_equal(popeye_spec, spec)
+    npt.assert_almost_equal(popeye_freqs, freqs)
+    npt.assert_almost_equal(popeye_times, times)
+    
+    # rectangular window skips the taper
+    freqs, times, spec = spectrogram(signal, Fs, window='boxcar', nperseg=Fs, noverlap=0, nfft=Fs)
+    popeye_spec = generate_spectrogram(signal, Fs, tr_length, decibels=False, window=None)[0]
+    npt.assert_almost_equal(popeye_spec, spec)
+    popeye_spec = generate_spectrogram(signal, Fs, tr_length, decibels=False, window='boxcar')[0]
+    npt.assert_almost_equal(popeye_spec, spec)
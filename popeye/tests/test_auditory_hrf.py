@@ -1,8 +1,5 @@
 import ctypes
 
-import matplotlib
-from matplotlib.pyplot import specgram
-
 import numpy as np
 import numpy.testing as npt
 from scipy.signal import chirp
@@ -1,3 +1,91 @@
+import os
+import ctypes
+import pickle
+import tempfile
+
+import numpy as np
+import numpy.testing as npt
+
+import popeye.utilities as utils
+import popeye.og as og
+from popeye.visual_stimulus import VisualStimulus, simulate_bar_stimulus
+
+def test_lookup_cached_model():
+    
+    # stimulus features
+    viewing_distance = 38
+    screen_width = 25
+    thetas = np.arange(0,360,90)
+    num_blank_steps = 10
+    num_bar_steps = 10
+    ecc = 12
+    tr_length = 1.0
+    scale_factor = 1.0
+    pixels_across = 50
+    pixels_down = 50
+    dtype = ctypes.c_int16
+    
+    # create the sweeping bar stimulus in memory
+    bar = simulate_bar_stimulus(pixels_across, pixels_down, viewing_distance, 
+                                screen_width, thetas, num_bar_steps, num_blank_steps, ecc)
+    
+    # create an instance of the Stimulus class
+    stimulus = VisualStimulus(bar, viewing_distance, screen_width, scale_factor, tr_length, dtype)
+    
+    # initialize the gaussian model
+    model = og.GaussianModel(stimulus, utils.spm_hrf)
+    model.hrf_delay = 0
+    model.mask_size = 5
+    
+    # cache a small grid
+    grids = ((-10,10),(-10,10),(0.25,5.25),)
+    cache = model.cache_model(grids, ncpus=2, Ns=3)
+    
+    # seed rng
+    rng = np.random.RandomState(4932)
+    
+    # a near-tie with model 13, ~100x above single precision, and a tie
+    # with model 20 that single precision cannot resolve at all
+    noise = rng.randn(len(cache[0][0]))
+    scale = np.abs(cache[13][0]).max()
+    cache = cache + [(cache[13][0] + 1e-5*scale*noise, cache[13][1] + 0.5),
+                     (cache[20][0] + 1e-10*scale*noise, cache[20][1] + 0.5)]
+    
+    # save it out and resurrect it
+    fd, path = tempfile.mkstemp(suffix='.pkl')
+    os.close(fd)
+    try:
+        pickle.dump(cache, open(path,'wb'))
+        cached = og.GaussianModel(stimulus, utils.spm_hrf)
+        cached.cached_model_path = path
+        cached.resurrect_cached_model
+    finally:
+        os.remove(path)
+    
+    # the exhaustive search in double precision
+    a = np.array([c[0] for c in cache])
+    p = np.array([c[1] for c in cache])
+    def best(b):
+        return p[np.argmin(((a-b)**2).sum(1))]
+    
+    # noisy voxels around a few of the cached models, and two either side
+    # of the middle of the near-tie, where the rss gap is ~1e-4 against a
+    # sum of squares of ~1e6
+    D = np.array([a[3] + 0.1*rng.randn(a.shape[1]),
+                  a[8] + 0.1*rng.randn(a.shape[1]),
+                  a[13] + 0.4e-5*scale*noise,
+                  a[13] + 0.6e-5*scale*noise])
+    
+    # 1-D and 2-D lookups match the double precision search
+    for d in D:
+        npt.assert_equal(cached.lookup_cached_model(d), best(d))
+    npt.assert_equal(cached.lookup_cached_model(D), [best(d) for d in D])
+    npt.assert_equal(cached.lookup_cached_model(D, block_size=3), [best(d) for d in D])
+    
+    # below single precision the tie can land on either model
+    d = a[20] + 0.6e-10*scale*noise
+    npt.assert_equal(cached.lookup_cached_model(d).tolist() in (p[20].tolist(), p[-1].tolist()), True)
+
 # import os
 # import sharedmem
 # import ctypes
@@ -324,3 +324,37 @@ def test_bounded_amplitude_failure():
 #     nt.assert_almost_equal(fit.sigma, sigma, 1)
 #     nt.assert_almost_equal(fit.beta, beta, 1)
     
+
+def test_convolve_hrf():
+    
+    # stimulus features
+    viewing_distance = 38
+    screen_width = 25
+    thetas = np.arange(0,360,90)
+    num_blank_steps = 10
+    num_bar_steps = 10
+    ecc = 12
+    tr_length = 1.0
+    scale_factor = 1.0
+    pixels_across = 50
+    pixels_down = 50
+    dtype = ctypes.c_int16
+    
+    # create the sweeping bar stimulus in memory
+    bar = simulate_bar_stimulus(pixels_across, pixels_down, viewing_distance, 
+                                screen_width, thetas, num_bar_steps, num_blank_steps, ecc)
+    
+    # create an instance of the Stimulus class
+    stimulus = VisualStimulus(bar, viewing_distance, screen_width, scale_factor, tr_length, dtype)
+    
+    # initialize the gaussian model
+    model = og.GaussianModel(stimulus, utils.spm_hrf)
+    model.hrf_delay = 0
+    
+    # the cached spectrum gives the same convolution as fftconvolve
+    response = np.random.rand(bar.shape[-1])
+    npt.assert_almost_equal(model.convolve_hrf(response), fftconvolve(response, model.hrf())[0:len(response)])
+    
+    # and is rebuilt once the HRF changes
+    model.hrf_delay = 1.5
+    npt.assert_almost_equal(model.convolve_hrf(response), fftconvolve(response, model.hrf())[0:len(response)])
@@ -451,6 +451,30 @@ def test_brute_force_search_manual_grids():
     # assert that the estimate is equal to the parameter
     npt.assert_equal(params, p0[0])
 
+def test_brute_force_search_threaded():
+
+    # create a parameter to estimate
+    params = (10,10)
+
+    # we need to define some search bounds
+    grid_1 = utils.grid_slice(5,15,5)
+    grid_2 = utils.grid_slice(5,15,5)
+    grids = (grid_1,grid_2,)
+
+    # create a simple function to transform the parameters
+    func = lambda freq, offset: np.sin( np.linspace(0,1,1000) * 2 * np.pi * freq) + offset
+
+    # create a "response"
+    response = func(*params)
+
+    # get the ball-park estimate, serially and threaded
+    p0 = utils.brute_force_search(response, utils.error_function, func, grids)
+    p1 = utils.brute_force_search(response, utils.error_function, func, grids, ncpus=2)
+
+    # assert that the estimates and search spaces are equal
+    npt.assert_equal(params, p1[0])
+    npt.assert_equal(p0[3], p1[3])
+
 def test_brute_force_search():
 
     # create a parameter to estimate
@@ -594,6 +618,18 @@ def test_percent_change():
          [-28.57142857, -14.28571429, 0., 14.28571429, 28.57142857],
           [-16.66666667, -8.33333333, 0., 8.33333333, 16.66666667],
           [-11.76470588, -5.88235294, 0., 5.88235294, 11.76470588]]))
+    
+    # the 1D case matches the n-dimensional one, to within rounding of the mean
+    ts = np.random.rand(100) + 1
+    npt.assert_allclose(utils.percent_change(ts), utils.percent_change(ts[np.newaxis,:])[0], rtol=1e-10)
+    
+    # and keeps the same output dtype
+    for ts in (np.random.rand(100).astype(np.float32) + 1, np.arange(1,101)):
+        ref = utils.percent_change(ts[np.newaxis,:])[0]
+        nt.assert_equal(utils.percent_change(ts).dtype, ref.dtype)
+        npt.assert_allclose(utils.percent_change(ts), ref, rtol=1e-5, atol=1e-4)
+    npt.assert_almost_equal(utils.percent_change(np.arange(1,5)), [-60., -20., 20., 60.])
+    nt.assert_true(np.all(np.isnan(utils.percent_change(np.zeros(5)))))
 
 def test_parallel_fit_Ns():
     
@@ -825,6 +861,63 @@ def test_parallel_fit_manual_grids():
         npt.assert_almost_equal(fit.sigma, sigma, 2)
         npt.assert_almost_equal(fit.beta, beta, 2)
         npt.assert_almost_equal(fit.baseline, baseline, 2)
+
+def test_multiprocess_fit():
+    
+    # stimulus features
+    viewing_distance = 38
+    screen_width = 25
+    thetas = np.arange(0,360,45)
+    num_blank_steps = 0
+    num_bar_steps = 30
+    ecc = 10
+    tr_length = 1.0
+    scale_factor = 0.10
+    pixels_down = 100
+    pixels_across = 100
+    dtype = ctypes.c_int16
+    
+    # create the sweeping bar stimulus in memory
+    bar = simulate_bar_stimulus(pixels_across, pixels_down, viewing_distance,
+                                screen_width, thetas, num_bar_steps, num_blank_steps, ecc)
+                                
+    # create an instance of the Stimulus class
+    stimulus = VisualStimulus(bar, viewing_distance, screen_width, scale_factor, tr_length, dtype)
+    
+    # initialize the gaussian model
+    model = og.GaussianModel(stimulus, utils.double_gamma_hrf)
+    model.hrf_delay = 0
+    
+    # create 4 different voxels of "data"
+    all_data = np.array([model.generate_prediction(x, 2.58, 1.24, 2.5, -0.25) for x in (-5.24, -2.1, 1.3, 4.6)])
+    indices = [(0,0,0),(0,0,1),(0,0,2),(0,0,3)]
+    
+    # set search grid
+    grids = (slice(-5,4,5), slice(-5,7,5), slice(1/stimulus.ppd,5.25,5))
+    
+    # set search bounds
+    bounds = ((-12.0,12.0), (-12.0,12.0), (1/stimulus.ppd,12.0), (1e-8,1e2), (None, None))
+    
+    # bundle the voxels
+    bundle = utils.multiprocess_bundle(og.GaussianFit, model, all_data, grids, bounds, indices)
+    
+    # fit them serially and in chunks
+    serial = [utils.parallel_fit(args) for args in bundle]
+    output = utils.multiprocess_fit(bundle, ncpus=2, chunksize=3)
+    
+    # assert equivalence and ordering
+    nt.assert_equal(len(output), len(bundle))
+    for fit, ref in zip(output, serial):
+        nt.assert_equal(fit.voxel_index, ref.voxel_index)
+        npt.assert_almost_equal(fit.estimate, ref.estimate)
+    
+    # a single worker, and the 0 that cpu_count()-1 gives on one CPU
+    for ncpus in (0, 1):
+        output = utils.multiprocess_fit(bundle, ncpus=ncpus)
+        nt.assert_equal(len(output), len(bundle))
+        for fit, ref in zip(output, serial):
+            nt.assert_equal(fit.voxel_index, ref.voxel_index)
+            npt.assert_almost_equal(fit.estimate, ref.estimate)
         
 def test_gaussian_2D():
     
@@ -878,6 +971,9 @@ def test_binner():
     
     npt.assert_equal(len(binned_signal), len(bins)-2)
     npt.assert_equal(binned_signal,[5,5])
+    
+    # plain lists of bins work too
+    npt.assert_equal(utils.binner(signal, times, list(bins)), [5,5])
 
 def test_find_files():
     
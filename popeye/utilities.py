@@ -7,6 +7,7 @@ though that might change with time.
 from __future__ import division
 import sys, os, time, fnmatch, copy, ctypes
 from multiprocessing import Array
+from multiprocessing.pool import ThreadPool
 from itertools import repeat
 from random import shuffle
 import datetime
@@ -70,8 +71,7 @@ def regularizing_objective_function(parameter, bundle): # pragma: no cover
         
     # fit each of the voxels
     num_cpus = sharedmem.cpu_count()-1
-    with sharedmem.Pool(np=num_cpus) as pool:
-        output = pool.map(parallel_fit, bundle)
+    output = multiprocess_fit(bundle, num_cpus)
     
     return output
 
@@ -184,22 +184,22 @@ def recast_estimation_results(output, grid_parent, overloaded=False):
     estimates = np.zeros(dims)
     
     # extract the prf model estimates from the results queue output
-    for fit in output:
+    fits = [fit for fit in output if not np.isnan(fit.rsquared)]
+    
+    if fits: # pragma: no cover
         
-        if not np.isnan(fit.rsquared): # pragma: no cover
+        # gather the voxel indices and the estimate + stats
+        idx = np.array([fit.voxel_index for fit in fits], dtype=np.intp)
+        if overloaded == True:
+            voxel_dat = [list(fit.overloaded_estimate) if fit.overloaded_estimate is not None
+                         else list(fit.estimate) for fit in fits]
+        else:
+            voxel_dat = [list(fit.estimate) for fit in fits]
+        voxel_dat = np.column_stack((voxel_dat, [fit.rsquared for fit in fits]))
+        
+        # assign them all at once
+        estimates[tuple(idx.T)] = voxel_dat
         
-            # gather the estimate + stats
-            if overloaded == True and fit.overloaded_estimate is not None:
-                voxel_dat = list(fit.overloaded_estimate)
-            else:
-                voxel_dat = list(fit.estimate)
-                
-            voxel_dat.append(fit.rsquared)
-            voxel_dat = np.array(voxel_dat)
-            
-            # assign to
-            estimates[tuple(fit.voxel_index)] = voxel_dat
-            
     # get header information from the gridParent and update for the prf volume
     aff = grid_parent.get_affine()
     hdr = grid_parent.get_header()
@@ -429,7 +429,7 @@ def gradient_descent_search(data, error_function, objective_function, parameters
 def stacker(x,y):
     return np.hstack((x,y))
 
-@numba.jit(nopython=False, parallel=False)
+@numba.jit(nopython=True, parallel=False)
 def rss(data,prediction):
     return np.nansum((data-prediction)**2)
 
@@ -452,18 +452,23 @@ def check_parameters(parameters, bounds):
     ensemble.extend(parameters)
     return ensemble
 
+# degenerate parameters at the edges of the search space divide by zero
+# in the normalizers, so those floating point warnings are silenced here
+# rather than for the whole process
 def error_function_rss(parameters, data, objective_function, verbose):
-    prediction = objective_function(*parameters)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        prediction = objective_function(*parameters)
     error = rss(data, prediction)
     return error
 
 # generic error function
 def error_function_residual(parameters, data, objective_function, verbose):
-    prediction = objective_function(*parameters)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        prediction = objective_function(*parameters)
     error = residual(data, prediction)
     return error
 
-def brute_force_search(data, error_function, objective_function, grids, Ns=None, verbose=False):
+def brute_force_search(data, error_function, objective_function, grids, Ns=None, verbose=False, ncpus=1):
 
     r"""A generic brute-force grid-search error minimization function.
 
@@ -521,6 +526,12 @@ def brute_force_search(data, error_function, objective_function, grids, Ns=None,
       The objective function that takes `parameters` and `args` and
       proceduces a model time-series.
 
+    ncpus : int
+      Number of threads across which the grid points are evaluated.
+      The grid points are independent, so with `ncpus` > 1 they are
+      handed to a thread pool that shares `data` and the model with
+      the calling process.
+
     Returns
     -------
     estimate : tuple
@@ -528,24 +539,42 @@ def brute_force_search(data, error_function, objective_function, grids, Ns=None,
 
     """
     
-    # if user provides their own grids
-    if isinstance(grids[0], SliceType):
-        output = brute(error_function_rss,
-                       args=(data, objective_function, verbose),
-                       ranges=grids,
-                       finish=None,
-                       full_output=True,
-                       disp=False)
-
-    # otherwise specify (min,max) and Ns for each dimension
+    # evaluate the grid in a thread pool if asked for
+    if ncpus > 1:
+        pool = ThreadPool(ncpus)
+        workers = pool.map
     else:
-        output = brute(error_function_rss,
-               args=(data, objective_function, verbose),
-               ranges=grids,
-               Ns=Ns,
-               finish=None,
-               full_output=True,
-               disp=False)
+        pool = None
+        workers = 1
+    
+    try:
+        
+        # if user provides their own grids
+        if isinstance(grids[0], SliceType):
+            output = brute(error_function_rss,
+                           args=(data, objective_function, verbose),
+                           ranges=grids,
+                           finish=None,
+                           full_output=True,
+                           disp=False,
+                           workers=workers)
+
+        # otherwise specify (min,max) and Ns for each dimension
+        else:
+            output = brute(error_function_rss,
+                   args=(data, objective_function, verbose),
+                   ranges=grids,
+                   Ns=Ns,
+                   finish=None,
+                   full_output=True,
+                   disp=False,
+                   workers=workers)
+    
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    
     return output
 
 # generic error function
@@ -605,7 +634,7 @@ def error_function(parameters, bounds, data, objective_function, verbose):
         return np.inf # pragma: no cover
         
     # else, return RSS
-    error = np.nansum((data-prediction)**2)
+    error = rss(data, prediction)
     # error = norm(data-prediction)
     
     # print for debugging
@@ -673,6 +702,22 @@ def double_gamma_hrf(delay, tr, fptr=1.0, integrator=trapz):
         
     return hrf
 
+@numba.jit(nopython=True, parallel=False, error_model='numpy')
+def percent_change_1D(ts):
+    
+    # mean in one sweep, a zero mean gives nan/inf like numpy does
+    m = 0.0
+    for i in range(ts.shape[0]):
+        m += ts[i]
+    m /= ts.shape[0]
+    
+    # rescale in another
+    pc = np.empty(ts.shape[0])
+    for i in range(ts.shape[0]):
+        pc[i] = (ts[i] / m - 1) * 100
+    
+    return pc
+
 def percent_change(ts, ax=-1):
 
     r"""Returns the % signal change of each point of the times series
@@ -709,8 +754,22 @@ def percent_change(ts, ax=-1):
            [ -11.7647,   -5.8824,    0.    ,    5.8824,   11.7647]])
     """
     ts = np.asarray(ts)
-
-    return (ts / np.expand_dims(np.mean(ts, ax), ax) - 1) * 100
+    
+    # a single timeseries, which is what every model prediction gets normalized with.
+    # the kernel's running-sum mean can differ from np.mean in the last bits, and it
+    # works in double precision, so floats are cast back to their own precision
+    if ts.ndim == 1:
+        pc = percent_change_1D(ts)
+        if np.issubdtype(ts.dtype, np.floating):
+            pc = pc.astype(ts.dtype, copy=False)
+        return pc
+    
+    # one temporary, scaled in place
+    pc = ts / np.expand_dims(np.mean(ts, ax), ax)
+    pc -= 1
+    pc *= 100
+    
+    return pc
 
 
 def zscore(time_series, axis=-1):
@@ -739,6 +798,7 @@ def zscore(time_series, axis=-1):
     if sl == [None]:
         zt = (time_series - et)/st
     else:
+        sl = tuple(sl)
         zt = time_series - et[sl]
         zt /= st[sl]
         
@@ -960,6 +1020,56 @@ def parallel_bootstrap(args):
     return fit
 
 
+def multiprocess_fit(bundle, ncpus=None, chunksize=None):
+    
+    r"""
+    Fits every voxel in a `multiprocess_bundle` across a pool of
+    worker processes.  The voxels are handed to the workers `chunksize`
+    at a time, so quick fits don't pay a queue round-trip each.
+    
+    Paramaters
+    ----------
+    bundle : list
+        A list of `parallel_fit` argument tuples, as built by
+        `multiprocess_bundle`.
+    
+    ncpus : int
+        The number of worker processes, defaults to all the CPUs. Values
+        below 1 are treated as 1.
+    
+    chunksize : int
+        The number of voxels fit per task, defaults to splitting the
+        bundle into roughly four tasks per worker.
+    
+    Returns
+    -------
+    
+    output : list
+        The `Fit` class objects, in the same order as `bundle`.
+        
+    """
+    
+    if ncpus is None:
+        ncpus = sharedmem.cpu_count()
+    
+    # callers passing cpu_count()-1 get 0 on a single-CPU host
+    ncpus = max(1, ncpus)
+    
+    if chunksize is None:
+        chunksize = max(1, len(bundle) // (4*ncpus))
+    
+    # split the voxels into chunks
+    chunks = [bundle[i:i+chunksize] for i in range(0, len(bundle), chunksize)]
+    
+    # the workers are forked, so they see the bundle without it being pickled
+    with sharedmem.Pool(np=ncpus) as pool:
+        output = pool.map(_fit_chunk, chunks)
+    
+    return [fit for chunk in output for fit in chunk]
+
+def _fit_chunk(chunk):
+    return [parallel_fit(args) for args in chunk]
+
 def parallel_fit(args):
 
     r"""
@@ -1043,12 +1153,39 @@ def find_files(directory, pattern):
     return names
 
 def binner(signal, times, bins):
+    
+    r"""
+    Sums `signal` into the bins ending at each of `bins`, each bin
+    covering (bins[t] - bin_width, bins[t]].
+    
+    Parameters
+    ----------
+    signal : ndarray
+        The signal to be binned.
+    
+    times : ndarray
+        The time of each sample in `signal`, in any order.
+    
+    bins : array_like
+        The bin edges, evenly spaced and sorted in ascending order. The
+        edges are located by bisection, so unsorted `bins` give wrong sums.
+    
+    """
+    
+    bins = np.asarray(bins)
     binned_response = np.zeros(len(bins)-2)
     bin_width = bins[1] - bins[0]
+    
+    # with the times sorted each bin is a contiguous slice, so its edges are
+    # found by bisection instead of masking the whole signal once per bin
+    order = np.argsort(times, kind='mergesort')
+    times = times[order]
+    signal = signal[order]
+    starts = np.searchsorted(times, bins - bin_width, side='left')
+    stops = np.searchsorted(times, bins, side='right')
+    
     for t in xrange(1,len(bins)):
-        the_bin = bins[t]
-        binned_signal = signal[(times >= the_bin-bin_width) & (times <= the_bin)]
-        binned_response[t-2] = np.sum(binned_signal)
+        binned_response[t-2] = np.sum(signal[starts[t]:stops[t]])
     return binned_response
 
 import sys
@@ -13,7 +13,7 @@ import gc
 import sys  
 
 import numpy as np
-from scipy.ndimage.interpolation import zoom
+from scipy.ndimage import zoom
 from scipy.io import loadmat
 from scipy.signal import square
 
@@ -187,13 +187,13 @@ def simulate_sinflicker_bar(pixels_across, pixels_down,
                             ecc, tr_length, flicker_hz, projector_hz):
     
     # get number of frames per volume
-    frames_per_vol = tr_length*projector_hz
+    frames_per_vol = int(tr_length*projector_hz)
     total_trs = len(thetas)*sweep_steps
     total_frames = frames_per_vol * total_trs
     total_secs = total_trs*tr_length
     
     # flicker
-    t = np.linspace(0,total_secs,total_secs*projector_hz)
+    t = np.linspace(0,total_secs,int(total_secs*projector_hz))
     full_run = np.sin(2 * np.pi * flicker_hz * t)
     full_run = np.uint8((full_run + 1) * 128)
     
@@ -438,10 +438,9 @@ class VisualStimulus(StimulusModel):
         # generate coordinate matrices
         deg_x, deg_y = generate_coordinate_matrices(self.pixels_across, self.pixels_down, self.ppd)
         
-        # share coordinate matrices
+        # share coordinate matrices, StimulusModel has already shared stim_arr
         self.deg_x = utils.generate_shared_array(deg_x, ctypes.c_double)
         self.deg_y = utils.generate_shared_array(deg_y, ctypes.c_double)
-        self.stim_arr = utils.generate_shared_array(stim_arr, dtype)
         
         if self.scale_factor == 1.0:
             
@@ -465,4 +464,8 @@ class VisualStimulus(StimulusModel):
         # add ppd for the down-sampled stimulus
         self.ppd0 = pixels_per_degree(self.pixels_across*self.scale_factor, self.screen_width, self.viewing_distance)
         
+        # squared pixel spacing in degrees, used to normalize the RFs
+        self.pixel_area = (self.deg_x[0,1] - self.deg_x[0,0])**2
+        self.pixel_area0 = (self.deg_x0[0,1] - self.deg_x0[0,0])**2
+        
         
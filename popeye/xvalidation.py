@@ -217,7 +217,7 @@ def parallel_xval(args):
     """ 
     
     # start timestamp
-    tic = time.clock()
+    tic = time.perf_counter()
     
     # unpackage the arguments
     models = args[0]
@@ -238,7 +238,7 @@ def parallel_xval(args):
         fit.mse = np.std(fit.data)/np.sqrt(fit.dof)
     
     # end timestamp
-    toc = time.clock()
+    toc = time.perf_counter()
     
     # print statement
     xvox = voxel_index[0]